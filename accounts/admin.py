@@ -7,5 +7,5 @@ from .models import GraphicalPassword
 class GraphicalPasswordAdmin(admin.ModelAdmin):
     list_display = ('user', 'created_at', 'updated_at')
     search_fields = ('user__username', 'user__email')
-    readonly_fields = ('image_sequence_hash', 'salt', 'created_at', 'updated_at')
+    readonly_fields = ('image_sequence_hash', 'created_at', 'updated_at')
 
@@ -0,0 +1,67 @@
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.hashers import BasePasswordHasher, make_password, mask_hash
+from django.utils.crypto import constant_time_compare
+
+# Hasher used for graphical passwords; older hashes are upgraded on login
+SEQUENCE_HASHER = 'argon2'
+
+
+def hash_image_sequence(sequence):
+    """
+    Hash the image sequence for secure storage.
+    Uses Django's argon2 hasher, which generates and embeds its own salt.
+    """
+    return make_password(sequence, hasher=SEQUENCE_HASHER)
+
+
+def batch_hash(sequences):
+    """
+    Hash many image sequences at once, e.g. for offline verification tools.
+    argon2 releases the GIL, so the hashes run in parallel on a thread pool.
+    Each hash takes ~100 MiB and several lanes, so the pool is capped at
+    one thread per CPU.
+    """
+    with ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as executor:
+        return list(executor.map(hash_image_sequence, sequences))
+
+
+class Sha256SequenceHasher(BasePasswordHasher):
+    """
+    Verifies graphical passwords from the original scheme, a hex
+    sha256(sequence + salt) digest with a separate hex salt.
+    Matching sequences are re-hashed with argon2 on the next login.
+    """
+    algorithm = 'gp_sha256'
+
+    def encode(self, password, salt):
+        self._check_encode_args(password, salt)
+        digest = hashlib.sha256((password + salt).encode()).hexdigest()
+        return f'{self.algorithm}${salt}${digest}'
+
+    def decode(self, encoded):
+        algorithm, salt, hash = encoded.split('$', 2)
+        assert algorithm == self.algorithm
+        return {
+            'algorithm': algorithm,
+            'hash': hash,
+            'salt': salt,
+        }
+
+    def verify(self, password, encoded):
+        decoded = self.decode(encoded)
+        encoded_2 = self.encode(password, decoded['salt'])
+        return constant_time_compare(encoded, encoded_2)
+
+    def safe_summary(self, encoded):
+        decoded = self.decode(encoded)
+        return {
+            'algorithm': decoded['algorithm'],
+            'salt': mask_hash(decoded['salt']),
+            'hash': mask_hash(decoded['hash']),
+        }
+
+    def harden_runtime(self, password, encoded):
+        pass
@@ -0,0 +1,25 @@
+# Generated by Django 4.0.3 on 2026-10-15 01:28
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='graphicalpassword',
+            name='id',
+        ),
+        migrations.AlterField(
+            model_name='graphicalpassword',
+            name='user',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='graphical_password', serialize=False, to=settings.AUTH_USER_MODEL),
+        ),
+    ]
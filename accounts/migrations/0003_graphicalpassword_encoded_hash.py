@@ -0,0 +1,41 @@
+from django.db import migrations, models
+
+
+def wrap_legacy_hashes(apps, schema_editor):
+    # Store the original sha256 digest and its salt in the format
+    # accounts.hashers.Sha256SequenceHasher verifies, so existing users keep
+    # logging in and get upgraded to argon2 on their next login
+    GraphicalPassword = apps.get_model('accounts', 'GraphicalPassword')
+    for gp in GraphicalPassword.objects.all():
+        gp.image_sequence_hash = f'gp_sha256${gp.salt}${gp.image_sequence_hash}'
+        gp.save(update_fields=['image_sequence_hash'])
+
+
+def unwrap_legacy_hashes(apps, schema_editor):
+    # Only hashes still in the original format can be split back into digest
+    # and salt; argon2 hashes are left as they are and will not verify
+    GraphicalPassword = apps.get_model('accounts', 'GraphicalPassword')
+    for gp in GraphicalPassword.objects.filter(image_sequence_hash__startswith='gp_sha256$'):
+        _, gp.salt, gp.image_sequence_hash = gp.image_sequence_hash.split('$', 2)
+        gp.save(update_fields=['image_sequence_hash', 'salt'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_graphicalpassword_user_pk'),
+    ]
+
+    operations = [
+        migrations.RunPython(wrap_legacy_hashes, unwrap_legacy_hashes),
+        # A default lets the salt column be re-added when migrating backwards
+        migrations.AlterField(
+            model_name='graphicalpassword',
+            name='salt',
+            field=models.CharField(default='', max_length=32),
+        ),
+        migrations.RemoveField(
+            model_name='graphicalpassword',
+            name='salt',
+        ),
+    ]
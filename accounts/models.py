@@ -8,11 +8,11 @@ class GraphicalPassword(models.Model):
     Stores the graphical password for each user.
     The image_sequence is stored as a hashed value for security.
     """
-    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='graphical_password')
-    image_sequence_hash = models.CharField(max_length=128)  # Hashed sequence
-    salt = models.CharField(max_length=32)  # Salt for hashing
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='graphical_password')
+    image_sequence_hash = models.CharField(max_length=128)  # Hasher-encoded sequence, salt included
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     def __str__(self):
         return f"Graphical Password for {self.user.username}"
+
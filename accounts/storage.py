@@ -0,0 +1,19 @@
+import xxhash
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+
+class XXHashManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Manifest storage that fingerprints static files with xxh3 instead of MD5.
+    Cache-busting names don't need a cryptographic hash, so collectstatic
+    can hash the image catalog much faster.
+    """
+
+    def file_hash(self, name, content=None):
+        if content is None:
+            return None
+        hasher = xxhash.xxh3_64()
+        for chunk in content.chunks():
+            hasher.update(chunk)
+        return hasher.hexdigest()
@@ -5,16 +5,21 @@ Uses Django's test client instead of Playwright for more reliable testing
 
 from django.test import TestCase, Client
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from accounts.models import GraphicalPassword
-from accounts.views import hash_image_sequence
+from accounts.hashers import batch_hash, hash_image_sequence
+from django.contrib.auth.hashers import check_password
+import hashlib
+import os
 import secrets
 
 
-class GraphicalPasswordAuthenticationTests(TestCase):
-    """Test suite for graphical password authentication"""
+class GraphicalPasswordTestCase(TestCase):
+    """Shared fixtures for the graphical password authentication tests"""
     
     def setUp(self):
         """Set up test client and test data"""
+        cache.clear()
         self.client = Client()
         self.test_user_data = {
             'username': 'testuser',
@@ -22,11 +27,13 @@ class GraphicalPasswordAuthenticationTests(TestCase):
             'password': 'TestPassword123'
         }
         self.graphical_password = 'anonymity.png,bitcoin.png,blackcoin.png,block_chain.png'
+
+
+class RegistrationTests(GraphicalPasswordTestCase):
+    """Registration form and its validation"""
     
     def test_01_registration_success(self):
         """Test successful user registration with graphical password"""
-        print("\n🧪 TEST 1: User Registration - Success")
-        
         response = self.client.post('/register', {
             'username': self.test_user_data['username'],
             'email': self.test_user_data['email'],
@@ -41,19 +48,16 @@ class GraphicalPasswordAuthenticationTests(TestCase):
         # User should be created
         user = User.objects.get(username=self.test_user_data['username'])
         self.assertIsNotNone(user)
+        self.assertTrue(user.check_password(self.test_user_data['password']))
         
         # Graphical password should be stored
         gp = GraphicalPassword.objects.get(user=user)
         self.assertIsNotNone(gp)
-        self.assertEqual(len(gp.salt), 32)  # Salt should be 32 chars (16 bytes in hex)
-        self.assertEqual(len(gp.image_sequence_hash), 64)  # SHA-256 hash is 64 chars
-        
-        print("  ✅ PASSED: User registered successfully with graphical password")
-    
+        self.assertTrue(gp.image_sequence_hash.startswith('argon2$'))  # Salt is embedded in the hash
+        self.assertTrue(check_password(self.graphical_password, gp.image_sequence_hash))
+
     def test_02_registration_no_graphical_password(self):
         """Test registration failure when graphical password is missing"""
-        print("\n🧪 TEST 2: Registration - Missing Graphical Password")
-        
         response = self.client.post('/register', {
             'username': 'testuser2',
             'email': 'test2@example.com',
@@ -67,13 +71,9 @@ class GraphicalPasswordAuthenticationTests(TestCase):
         
         # User should NOT be created
         self.assertFalse(User.objects.filter(username='testuser2').exists())
-        
-        print("  ✅ PASSED: Registration blocked without graphical password")
-    
+
     def test_03_registration_too_few_images(self):
         """Test registration failure with less than 4 images"""
-        print("\n🧪 TEST 3: Registration - Too Few Images")
-        
         response = self.client.post('/register', {
             'username': 'testuser3',
             'email': 'test3@example.com',
@@ -87,13 +87,9 @@ class GraphicalPasswordAuthenticationTests(TestCase):
         
         # User should NOT be created
         self.assertFalse(User.objects.filter(username='testuser3').exists())
-        
-        print("  ✅ PASSED: Registration blocked with less than 4 images")
-    
+
     def test_04_registration_too_many_images(self):
         """Test registration failure with more than 6 images"""
-        print("\n🧪 TEST 4: Registration - Too Many Images")
-        
         response = self.client.post('/register', {
             'username': 'testuser4',
             'email': 'test4@example.com',
@@ -106,13 +102,94 @@ class GraphicalPasswordAuthenticationTests(TestCase):
         
         # User should NOT be created
         self.assertFalse(User.objects.filter(username='testuser4').exists())
+
+    def test_10_duplicate_username(self):
+        """Test that duplicate usernames are rejected"""
+        # Create first user
+        User.objects.create_user(username='duplicate', email='first@example.com', password='pass123')
+        
+        # Try to create second user with same username
+        response = self.client.post('/register', {
+            'username': 'duplicate',
+            'email': 'second@example.com',
+            'password': 'pass456',
+            'graphical_password': self.graphical_password
+        })
+        
+        # Should stay on registration page
+        self.assertEqual(response.status_code, 302)
+        self.assertIn('/register', response.url)
+        
+        # Should only have 1 user with that username
+        self.assertEqual(User.objects.filter(username='duplicate').count(), 1)
+
+    def test_11_duplicate_email(self):
+        """Test that duplicate emails are rejected"""
+        # Create first user
+        User.objects.create_user(username='first', email='shared@example.com', password='pass123')
+        
+        # Try to register a second user with the same email
+        response = self.client.post('/register', {
+            'username': 'second',
+            'email': 'shared@example.com',
+            'password': 'pass456',
+            'graphical_password': self.graphical_password
+        })
+        
+        # Should stay on registration page
+        self.assertEqual(response.status_code, 302)
+        self.assertIn('/register', response.url)
+        
+        # Second user should NOT be created
+        self.assertFalse(User.objects.filter(username='second').exists())
+
+    def test_14_registration_unknown_images(self):
+        """Test registration failure with image names outside the catalog"""
+        response = self.client.post('/register', {
+            'username': 'testuser14',
+            'email': 'test14@example.com',
+            'password': 'TestPassword123',
+            'graphical_password': 'anonymity.png,bitcoin.png,forged.png,../secret.png'
+        })
+        
+        # Should stay on registration page
+        self.assertEqual(response.status_code, 302)
+        self.assertIn('/register', response.url)
+        
+        # User should NOT be created
+        self.assertFalse(User.objects.filter(username='testuser14').exists())
+
+    def test_19_image_grid_rendered(self):
+        """Test that every page with a grid shows the full image catalog"""
+        # The index page renders the registration template first, so it must
+        # not leave an empty grid in the fragment cache
+        for url in ('/', '/register', '/login', '/register'):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertContains(response, 'alt="anonymity.png"')
+            self.assertContains(response, 'alt="zcoin.png"')
+
+    def test_20_duplicate_username_and_email(self):
+        """Test that a duplicate username is reported before a duplicate email"""
+        User.objects.create_user(username='both', email='both@example.com', password='pass123')
+        
+        response = self.client.post('/register', {
+            'username': 'both',
+            'email': 'both@example.com',
+            'password': 'pass456',
+            'graphical_password': self.graphical_password
+        }, follow=True)
         
-        print("  ✅ PASSED: Registration blocked with more than 6 images")
+        self.assertRedirects(response, '/register')
+        self.assertContains(response, 'Username already exists')
+        self.assertEqual(User.objects.filter(username='both').count(), 1)
+
+
+class LoginTests(GraphicalPasswordTestCase):
+    """Login with text and graphical passwords"""
     
     def test_05_login_success(self):
         """Test successful login with correct credentials"""
-        print("\n🧪 TEST 5: Login - Success with Correct Credentials")
-        
         # First create a user
         user = User.objects.create_user(
             username=self.test_user_data['username'],
@@ -121,13 +198,8 @@ class GraphicalPasswordAuthenticationTests(TestCase):
         )
         
         # Create graphical password
-        salt = secrets.token_hex(16)
-        hashed = hash_image_sequence(self.graphical_password, salt)
-        GraphicalPassword.objects.create(
-            user=user,
-            image_sequence_hash=hashed,
-            salt=salt
-        )
+        hashed = hash_image_sequence(self.graphical_password)
+        GraphicalPassword.objects.create(user=user, image_sequence_hash=hashed)
         
         # Try to login
         response = self.client.post('/login', {
@@ -139,23 +211,18 @@ class GraphicalPasswordAuthenticationTests(TestCase):
         # Should redirect to home page
         self.assertEqual(response.status_code, 302)
         self.assertEqual(response.url, '/')
-        
-        print("  ✅ PASSED: Login successful with correct credentials")
-    
+
     def test_06_login_wrong_graphical_password(self):
         """Test login failure with wrong graphical password"""
-        print("\n🧪 TEST 6: Login - Wrong Graphical Password")
-        
         # Create user with specific graphical password
         user = User.objects.create_user(
             username='logintest1',
             password='TestPassword123'
         )
         
-        salt = secrets.token_hex(16)
         correct_gp = 'anonymity.png,bitcoin.png,blackcoin.png,block_chain.png'
-        hashed = hash_image_sequence(correct_gp, salt)
-        GraphicalPassword.objects.create(user=user, image_sequence_hash=hashed, salt=salt)
+        hashed = hash_image_sequence(correct_gp)
+        GraphicalPassword.objects.create(user=user, image_sequence_hash=hashed)
         
         # Try to login with wrong graphical password
         wrong_gp = 'centralized.png,conversion.png,decryption.png,dogecoin.png'
@@ -163,28 +230,23 @@ class GraphicalPasswordAuthenticationTests(TestCase):
             'username': 'logintest1',
             'password': 'TestPassword123',
             'graphical_password': wrong_gp
-        })
+        }, follow=True)
         
-        # Should stay on login page
-        self.assertEqual(response.status_code, 302)
-        self.assertIn('/login', response.url)
-        
-        print("  ✅ PASSED: Login blocked with wrong graphical password")
-    
+        # Should stay on login page and explain why
+        self.assertRedirects(response, '/login')
+        self.assertContains(response, 'Invalid graphical password')
+
     def test_07_login_wrong_order(self):
         """Test login failure with right images but wrong order"""
-        print("\n🧪 TEST 7: Login - Correct Images, Wrong Order")
-        
         # Create user
         user = User.objects.create_user(
             username='logintest2',
             password='TestPassword123'
         )
         
-        salt = secrets.token_hex(16)
         correct_gp = 'anonymity.png,bitcoin.png,blackcoin.png,block_chain.png'
-        hashed = hash_image_sequence(correct_gp, salt)
-        GraphicalPassword.objects.create(user=user, image_sequence_hash=hashed, salt=salt)
+        hashed = hash_image_sequence(correct_gp)
+        GraphicalPassword.objects.create(user=user, image_sequence_hash=hashed)
         
         # Try with reversed order
         reversed_gp = 'block_chain.png,blackcoin.png,bitcoin.png,anonymity.png'
@@ -197,86 +259,155 @@ class GraphicalPasswordAuthenticationTests(TestCase):
         # Should stay on login page
         self.assertEqual(response.status_code, 302)
         self.assertIn('/login', response.url)
-        
-        print("  ✅ PASSED: Order matters - login blocked")
-    
+
     def test_08_login_wrong_text_password(self):
         """Test login failure with wrong text password"""
-        print("\n🧪 TEST 8: Login - Wrong Text Password")
-        
         # Create user
         user = User.objects.create_user(
             username='logintest3',
             password='CorrectPassword123'
         )
         
-        salt = secrets.token_hex(16)
-        hashed = hash_image_sequence(self.graphical_password, salt)
-        GraphicalPassword.objects.create(user=user, image_sequence_hash=hashed, salt=salt)
+        hashed = hash_image_sequence(self.graphical_password)
+        GraphicalPassword.objects.create(user=user, image_sequence_hash=hashed)
         
         # Try with wrong text password
         response = self.client.post('/login', {
             'username': 'logintest3',
             'password': 'WrongPassword123',
             'graphical_password': self.graphical_password
+        }, follow=True)
+        
+        # Should stay on login page and explain why
+        self.assertRedirects(response, '/login')
+        self.assertContains(response, 'Invalid username or password')
+
+    def test_12_login_without_graphical_password(self):
+        """Test login failure for a user who never set a graphical password"""
+        User.objects.create_user(username='nogp', password='TestPassword123')
+        
+        response = self.client.post('/login', {
+            'username': 'nogp',
+            'password': 'TestPassword123',
+            'graphical_password': self.graphical_password
+        }, follow=True)
+        
+        # Should stay on login page and explain why
+        self.assertRedirects(response, '/login')
+        self.assertContains(response, 'Graphical password not set for this user')
+
+    def test_13_login_inactive_user(self):
+        """Test login failure for an inactive user with correct credentials"""
+        user = User.objects.create_user(
+            username='inactive',
+            password='TestPassword123',
+            is_active=False
+        )
+        
+        hashed = hash_image_sequence(self.graphical_password)
+        GraphicalPassword.objects.create(user=user, image_sequence_hash=hashed)
+        
+        response = self.client.post('/login', {
+            'username': 'inactive',
+            'password': 'TestPassword123',
+            'graphical_password': self.graphical_password
         })
         
         # Should stay on login page
         self.assertEqual(response.status_code, 302)
         self.assertIn('/login', response.url)
+
+    def test_16_malformed_post(self):
+        """Test that POSTs with missing fields are rejected instead of erroring"""
+        response = self.client.post('/register', {
+            'email': 'test16@example.com',
+            'graphical_password': self.graphical_password
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertIn('/register', response.url)
         
-        print("  ✅ PASSED: Login blocked with wrong text password")
+        response = self.client.post('/login', {
+            'graphical_password': self.graphical_password
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertIn('/login', response.url)
+
+    def test_17_login_malformed_sequence(self):
+        """Test that malformed graphical passwords are rejected without database work"""
+        user = User.objects.create_user(username='shortcut', password='TestPassword123')
+        hashed = hash_image_sequence(self.graphical_password)
+        GraphicalPassword.objects.create(user=user, image_sequence_hash=hashed)
+        
+        for sequence in ('anonymity.png,bitcoin.png',
+                         'anonymity.png,bitcoin.png,blackcoin.png,forged.png'):
+            with self.assertNumQueries(0):
+                response = self.client.post('/login', {
+                    'username': 'shortcut',
+                    'password': 'TestPassword123',
+                    'graphical_password': sequence
+                })
+            self.assertEqual(response.status_code, 302)
+            self.assertIn('/login', response.url)
+
+
+class HashingTests(GraphicalPasswordTestCase):
+    """Hashing and verification of stored graphical passwords"""
     
     def test_09_password_hashing_security(self):
         """Test that same graphical password for different users produces different hashes"""
-        print("\n🧪 TEST 9: Security - Password Hashing with Different Salts")
-        
         # Create two users with same graphical password
         user1 = User.objects.create_user(username='user1', password='pass123')
         user2 = User.objects.create_user(username='user2', password='pass123')
         
         same_gp = 'anonymity.png,bitcoin.png,blackcoin.png,block_chain.png'
         
-        salt1 = secrets.token_hex(16)
-        salt2 = secrets.token_hex(16)
+        hash1 = hash_image_sequence(same_gp)
+        hash2 = hash_image_sequence(same_gp)
         
-        hash1 = hash_image_sequence(same_gp, salt1)
-        hash2 = hash_image_sequence(same_gp, salt2)
+        GraphicalPassword.objects.bulk_create([
+            GraphicalPassword(user=user1, image_sequence_hash=hash1),
+            GraphicalPassword(user=user2, image_sequence_hash=hash2),
+        ])
         
-        GraphicalPassword.objects.create(user=user1, image_sequence_hash=hash1, salt=salt1)
-        GraphicalPassword.objects.create(user=user2, image_sequence_hash=hash2, salt=salt2)
-        
-        # Salts should be different
-        self.assertNotEqual(salt1, salt2)
-        
-        # Hashes should be different (due to different salts)
+        # Hashes should be different (each embeds its own random salt)
         self.assertNotEqual(hash1, hash2)
         
-        print("  ✅ PASSED: Different salts produce different hashes for same password")
-    
-    def test_10_duplicate_username(self):
-        """Test that duplicate usernames are rejected"""
-        print("\n🧪 TEST 10: Registration - Duplicate Username")
+        # Both should still verify against the same sequence
+        self.assertTrue(check_password(same_gp, hash1))
+        self.assertTrue(check_password(same_gp, hash2))
+
+    def test_15_batch_hash_verifies(self):
+        """Test that batch hashing gives a verifiable hash for each sequence"""
+        sequences = [self.graphical_password,
+                     'block_chain.png,blackcoin.png,bitcoin.png,anonymity.png',
+                     'centralized.png,conversion.png,decryption.png,dogecoin.png']
+        
+        hashes = batch_hash(sequences)
+        self.assertEqual(len(hashes), len(sequences))
+        for sequence, hashed in zip(sequences, hashes):
+            self.assertTrue(check_password(sequence, hashed))
+
+    def test_18_legacy_hash_upgraded_on_login(self):
+        """Test that hashes from the original sha256 scheme still log in and get upgraded"""
+        user = User.objects.create_user(username='legacy', password='TestPassword123')
         
-        # Create first user
-        User.objects.create_user(username='duplicate', email='first@example.com', password='pass123')
+        # Stored the way the original register view did, wrapped with its salt
+        salt = secrets.token_hex(16)
+        digest = hashlib.sha256((self.graphical_password + salt).encode()).hexdigest()
+        legacy = f'gp_sha256${salt}${digest}'
+        GraphicalPassword.objects.create(user=user, image_sequence_hash=legacy)
         
-        # Try to create second user with same username
-        response = self.client.post('/register', {
-            'username': 'duplicate',
-            'email': 'second@example.com',
-            'password': 'pass456',
+        response = self.client.post('/login', {
+            'username': 'legacy',
+            'password': 'TestPassword123',
             'graphical_password': self.graphical_password
         })
+        self.assertEqual(response.url, '/')
         
-        # Should stay on registration page
-        self.assertEqual(response.status_code, 302)
-        self.assertIn('/register', response.url)
-        
-        # Should only have 1 user with that username
-        self.assertEqual(User.objects.filter(username='duplicate').count(), 1)
-        
-        print("  ✅ PASSED: Duplicate username rejected")
+        # The stored hash should now be argon2
+        gp = GraphicalPassword.objects.get(user=user)
+        self.assertTrue(gp.image_sequence_hash.startswith('argon2$'))
+        self.assertTrue(check_password(self.graphical_password, gp.image_sequence_hash))
 
 
 def run_tests():
@@ -287,7 +418,8 @@ def run_tests():
     print("🚀 GRAPHICAL PASSWORD AUTHENTICATION - AUTOMATED TEST SUITE")
     print("="*80 + "\n")
     
-    runner = DiscoverRunner(verbosity=2, interactive=False, keepdb=False)
+    # Each TestCase class is a unit that --parallel can hand to a process
+    runner = DiscoverRunner(verbosity=2, interactive=False, keepdb=False, parallel=os.cpu_count() or 1)
     failures = runner.run_tests(['accounts'])
     
     print("\n" + "="*80)
@@ -2,38 +2,58 @@ from django.contrib import messages
 from django.shortcuts import render, redirect
 
 from django.contrib.auth import authenticate
+from django.contrib.auth.hashers import check_password, make_password
 from django.contrib.auth.models import User, auth
 
 from django.core.validators import validate_email
 from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
 
 from django.contrib.auth.decorators import login_required
 
+from .hashers import SEQUENCE_HASHER, hash_image_sequence
 from .models import GraphicalPassword
-import hashlib
-import secrets
+
+
+# Images offered for the graphical password, built once at import
+IMAGE_CHOICES = ('anonymity.png', 'bitcoin.png', 'blackcoin.png',
+                 'block_chain.png', 'centralized.png', 'conversion.png',
+                 'currency_cap.png', 'decentralized.png', 'decryption.png',
+                 'digital_key.png', 'disclosed_identity.png', 'distributed.png',
+                 'dogecoin.png', 'emercoin.png', 'encryption.png', 'ethereum.png',
+                 'feathercoin.png', 'free.png', 'ledger.png', 'litecoin.png',
+                 'lost_key.png', 'mastercoin.png', 'miner.png', 'miner2.png',
+                 'mining.png', 'mining2.png', 'mining_center.png',
+                 'mining_pool.png', 'mining_pool2.png', 'monero.png', 'myriad.png',
+                 'namecoin.png', 'no_double_spending.png', 'nxt.png', 'p2p.png',
+                 'peercoin.png', 'ponzi_scheme.png', 'primecoin.png', 'pseudonimity.png',
+                 'pyramid_scheme.png', 'receive.png', 'ripple.png', 'send.png',
+                 'siacoin.png', 'stellar_lumen.png', 'transaction.png',
+                 'tumbler.png', 'wallet.png', 'zcash.png', 'zcoin.png')
+IMAGE_SET = frozenset(IMAGE_CHOICES)
 
 
 # Create your views here.
 
-def hash_image_sequence(sequence, salt):
-    """
-    Hash the image sequence with salt for secure storage.
-    """
-    combined = sequence + salt
-    return hashlib.sha256(combined.encode()).hexdigest()
+def _render_with_images(request, template):
+    return render(request, template, {'images': IMAGE_CHOICES})
 
 
 def index(request):
-    return render(request, 'accounts/register.html')
+    return _render_with_images(request, 'accounts/register.html')
 
 
 def register(request):
     if request.method == 'POST':
-        username = request.POST['username']
-        email = request.POST['email']
-        password = request.POST['password']
-        graphical_password = request.POST.get('graphical_password', '')
+        post = request.POST
+        username = post.get('username', '')
+        email = post.get('email', '')
+        password = post.get('password', '')
+        graphical_password = post.get('graphical_password', '')
+
+        if not username or not password:
+            messages.error(request, 'Please enter a username and password')
+            return redirect('register')
 
         # Validate email
         try:
@@ -52,107 +72,93 @@ def register(request):
             messages.error(request, 'Please select between 4 to 6 images for your graphical password')
             return redirect('register')
 
-        # Check if username exists
-        if User.objects.filter(username=username).exists():
-            messages.error(request, 'Username already exists')
+        # Reject image names that are not part of the catalog
+        if not IMAGE_SET.issuperset(images):
+            messages.error(request, 'Invalid graphical password selection')
             return redirect('register')
 
-        # Check if email exists
-        elif User.objects.filter(email=email).exists():
-            messages.error(request, 'Email already registered')
+        # Email is not unique in the database, so it still needs a lookup.
+        # A taken username is still reported first, as it always was.
+        if User.objects.filter(email=email).exists():
+            if User.objects.filter(username=username).exists():
+                messages.error(request, 'Username already exists')
+            else:
+                messages.error(request, 'Email already registered')
             return redirect('register')
 
-        else:
-            # Create user
-            user = User.objects.create_user(username=username, email=email, password=password)
-            user.save()
-            
-            # Create graphical password
-            salt = secrets.token_hex(16)
-            hashed_sequence = hash_image_sequence(graphical_password, salt)
-            
-            GraphicalPassword.objects.create(
-                user=user,
-                image_sequence_hash=hashed_sequence,
-                salt=salt
-            )
-            
-            messages.success(request, 'Registration successful! Please login.')
-            return redirect('login')
+        # Hash both passwords outside the transaction to keep it short
+        hashed_password = make_password(password)
+        hashed_sequence = hash_image_sequence(graphical_password)
+
+        # Let the unique username constraint catch duplicates, which also
+        # closes the race between checking and inserting
+        try:
+            with transaction.atomic():
+                user = User.objects.create(username=User.normalize_username(username),
+                                           email=User.objects.normalize_email(email),
+                                           password=hashed_password)
+                GraphicalPassword.objects.create(user=user, image_sequence_hash=hashed_sequence)
+        except IntegrityError:
+            messages.error(request, 'Username already exists')
+            return redirect('register')
+
+        messages.success(request, 'Registration successful! Please login.')
+        return redirect('login')
 
-    # List of images for the graphical password
-    images = ['anonymity.png', 'bitcoin.png', 'blackcoin.png',
-              'block_chain.png', 'centralized.png', 'conversion.png',
-              'currency_cap.png', 'decentralized.png', 'decryption.png',
-              'digital_key.png', 'disclosed_identity.png', 'distributed.png',
-              'dogecoin.png', 'emercoin.png', 'encryption.png', 'ethereum.png',
-              'feathercoin.png', 'free.png', 'ledger.png', 'litecoin.png',
-              'lost_key.png', 'mastercoin.png', 'miner.png', 'miner2.png',
-              'mining.png', 'mining2.png', 'mining_center.png',
-              'mining_pool.png', 'mining_pool2.png', 'monero.png', 'myriad.png', 
-              'namecoin.png', 'no_double_spending.png', 'nxt.png', 'p2p.png', 
-              'peercoin.png', 'ponzi_scheme.png', 'primecoin.png', 'pseudonimity.png',
-              'pyramid_scheme.png', 'receive.png', 'ripple.png', 'send.png',
-              'siacoin.png', 'stellar_lumen.png', 'transaction.png',
-              'tumbler.png', 'wallet.png', 'zcash.png', 'zcoin.png']
-    
-    context = {'images': images}
-    return render(request, 'accounts/register.html', context)
+    return _render_with_images(request, 'accounts/register.html')
 
 
 def login(request):
     if request.method == 'POST':
-        username = request.POST['username']
-        password = request.POST['password']
-        graphical_password = request.POST.get('graphical_password', '')
+        post = request.POST
+        username = post.get('username', '')
+        password = post.get('password', '')
+        graphical_password = post.get('graphical_password', '')
 
         # Validate graphical password is provided
         if not graphical_password:
             messages.error(request, 'Please select your graphical password')
             return redirect('login')
 
-        # Authenticate with text password
-        user = authenticate(username=username, password=password)
-
-        if user is not None:
-            # Verify graphical password
-            try:
-                gp = GraphicalPassword.objects.get(user=user)
-                hashed_input = hash_image_sequence(graphical_password, gp.salt)
-                
-                if hashed_input == gp.image_sequence_hash:
-                    auth.login(request, user)
-                    messages.success(request, f'Welcome back, {username}!')
-                    return redirect('/')
-                else:
-                    messages.error(request, 'Invalid graphical password')
-                    return redirect('login')
-                    
-            except GraphicalPassword.DoesNotExist:
+        # Registered sequences are always 4-6 catalog images, so anything else
+        # can be rejected before paying for the database or password hashing
+        images = graphical_password.split(',')
+        if len(images) < 4 or len(images) > 6 or not IMAGE_SET.issuperset(images):
+            messages.error(request, 'Invalid graphical password')
+            return redirect('login')
+
+        # Fetch the graphical password and its user in one joined query
+        try:
+            gp = GraphicalPassword.objects.select_related('user').get(user__username=username)
+        except GraphicalPassword.DoesNotExist:
+            # Unknown user, or a user who never set a graphical password
+            if authenticate(username=username, password=password) is not None:
                 messages.error(request, 'Graphical password not set for this user')
-                return redirect('login')
-        else:
+            else:
+                messages.error(request, 'Invalid username or password')
+            return redirect('login')
+        user = gp.user
+
+        # Same checks authenticate() applies, without fetching the user again
+        if not (user.is_active and user.check_password(password)):
             messages.error(request, 'Invalid username or password')
             return redirect('login')
 
-    # Same images list for login
-    images = ['anonymity.png', 'bitcoin.png', 'blackcoin.png',
-              'block_chain.png', 'centralized.png', 'conversion.png',
-              'currency_cap.png', 'decentralized.png', 'decryption.png',
-              'digital_key.png', 'disclosed_identity.png', 'distributed.png',
-              'dogecoin.png', 'emercoin.png', 'encryption.png', 'ethereum.png',
-              'feathercoin.png', 'free.png', 'ledger.png', 'litecoin.png',
-              'lost_key.png', 'mastercoin.png', 'miner.png', 'miner2.png',
-              'mining.png', 'mining2.png', 'mining_center.png',
-              'mining_pool.png', 'mining_pool2.png', 'monero.png', 'myriad.png', 
-              'namecoin.png', 'no_double_spending.png', 'nxt.png', 'p2p.png', 
-              'peercoin.png', 'ponzi_scheme.png', 'primecoin.png', 'pseudonimity.png',
-              'pyramid_scheme.png', 'receive.png', 'ripple.png', 'send.png',
-              'siacoin.png', 'stellar_lumen.png', 'transaction.png',
-              'tumbler.png', 'wallet.png', 'zcash.png', 'zcoin.png']
-    
-    context = {'images': images}
-    return render(request, 'accounts/login.html', context)
+        # Verify graphical password
+        def upgrade_hash(sequence):
+            gp = GraphicalPassword(user=user, image_sequence_hash=hash_image_sequence(sequence))
+            gp.save(update_fields=['image_sequence_hash', 'updated_at'])
+
+        if check_password(graphical_password, gp.image_sequence_hash,
+                          setter=upgrade_hash, preferred=SEQUENCE_HASHER):
+            auth.login(request, user)
+            messages.success(request, f'Welcome back, {username}!')
+            return redirect('/')
+        else:
+            messages.error(request, 'Invalid graphical password')
+            return redirect('login')
+
+    return _render_with_images(request, 'accounts/login.html')
 
 
 @login_required(login_url='login')
@@ -0,0 +1,116 @@
+"""
+Shared Playwright fixtures for the browser tests in test_graphical_password.py
+
+The playwright driver, browser and per-test context/page fixtures come from
+pytest-playwright; this file only adjusts how they are launched and set up.
+"""
+
+import os
+from pathlib import Path
+
+import pytest
+
+# Chromium flags that trim headless startup and background work
+LAUNCH_ARGS = [
+    "--disable-dev-shm-usage",
+    "--disable-gpu",
+    "--no-first-run",
+    "--disable-extensions",
+    "--disable-background-timer-throttling",
+    "--disable-renderer-backgrounding",
+]
+
+# Disabling the sandbox is only safe in a trusted, throwaway CI container
+if os.environ.get("CI"):
+    LAUNCH_ARGS.append("--no-sandbox")
+
+# Actions and navigations against the local dev server should take well
+# under this; Playwright's 30s default only makes broken tests slow to fail
+DEFAULT_TIMEOUT_MS = 5000
+
+# Opt-in: set PLAYWRIGHT_PERSISTENT_CACHE=1 to keep the browser's HTTP cache
+# between runs, in one profile per xdist worker under .pw-cache/. Tracing,
+# video and screenshots hook into pytest-playwright's own context, so they
+# are not available in this mode.
+PERSISTENT_CACHE = bool(os.environ.get("PLAYWRIGHT_PERSISTENT_CACHE"))
+CACHE_DIR = Path(__file__).resolve().parent / ".pw-cache"
+ARTIFACT_OPTIONS = ("--tracing", "--video", "--screenshot")
+
+
+def pytest_configure(config):
+    if not PERSISTENT_CACHE:
+        return
+    enabled = [option for option in ARTIFACT_OPTIONS if config.getoption(option) != "off"]
+    if enabled:
+        raise pytest.UsageError(
+            f"{', '.join(enabled)} cannot be used with PLAYWRIGHT_PERSISTENT_CACHE"
+        )
+
+# Resources the tests never look at; images are picked by their alt text
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "media"})
+
+
+def _block_heavy_resources(route):
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        route.abort()
+    else:
+        route.continue_()
+
+
+def _configure_context(context):
+    context.set_default_timeout(DEFAULT_TIMEOUT_MS)
+    context.set_default_navigation_timeout(DEFAULT_TIMEOUT_MS)
+    context.route("**/*", _block_heavy_resources)
+
+
+@pytest.fixture(scope="session")
+def browser_type_launch_args(browser_type_launch_args):
+    return {**browser_type_launch_args, "args": LAUNCH_ARGS}
+
+
+# pytest only follows the overriding fixture's own arguments when working out
+# which fixtures a test uses, so browser_name is named here for --browser to
+# still parametrize the tests
+@pytest.fixture
+def context(context, browser_name):
+    """pytest-playwright's per-test context, with short timeouts and no image downloads"""
+    _configure_context(context)
+    return context
+
+
+@pytest.fixture(scope="session")
+def new_context(browser_context_args):
+    """
+    Factory for extra contexts set up like `context`, for fixtures and tests
+    that need their own (e.g. a saved storage state)
+    """
+    def factory(browser, **kwargs):
+        context = browser.new_context(**{**browser_context_args, **kwargs})
+        _configure_context(context)
+        return context
+    return factory
+
+
+@pytest.fixture(scope="session")
+def persistent_context(browser_type, browser_type_launch_args, browser_context_args):
+    """A context on an on-disk profile, so cached assets survive between runs"""
+    # A profile can only be open once, so each xdist worker gets its own
+    worker = os.environ.get("PYTEST_XDIST_WORKER", "main")
+    context = browser_type.launch_persistent_context(
+        CACHE_DIR / worker, **browser_type_launch_args, **browser_context_args
+    )
+    _configure_context(context)
+    yield context
+    context.close()
+
+
+if PERSISTENT_CACHE:
+    # Only replaces pytest-playwright's page when opted in, and takes its
+    # context as an argument so --browser still parametrizes every test
+    @pytest.fixture
+    def page(persistent_context):
+        """A page in the worker's persistent context, with its cookies (and so any login) cleared"""
+        persistent_context.clear_cookies()
+        page = persistent_context.new_page()
+        yield page
+        page.close()